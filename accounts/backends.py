@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the role profiles together with the session user.
+    Patient and doctor views read request.user.<role>_profile on every request,
+    so joining them here saves that query each time.
+    """
+    
+    PROFILE_RELATIONS = ('patient_profile', 'doctor_profile')
+    
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related(
+                *self.PROFILE_RELATIONS
+            ).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -121,3 +121,26 @@ Type: {notification_type}
         except Exception as e:
             logger.error(f"Error sending new appointment notification: {e}")
             return False
+    
+    @classmethod
+    def send_booking_notifications(cls, patient_user, doctor_user, date: str, time: str):
+        """
+        Send the booking confirmation to the patient and the new appointment
+        notice to the doctor. Failures are logged and never raised, so this is
+        safe to run from a transaction.on_commit() hook.
+        """
+        try:
+            cls.send_booking_confirmation(
+                patient_user,
+                doctor_name=f"Dr. {doctor_user.get_full_name()}",
+                date=date,
+                time=time
+            )
+            cls.send_new_appointment_notification(
+                doctor_user,
+                patient_name=patient_user.get_full_name(),
+                date=date,
+                time=time
+            )
+        except Exception as e:
+            logger.error(f"Failed to send booking notifications: {e}")
@@ -1,3 +1,42 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from accounts.models import User
 
-# Create your tests here.
+
+@pytest.fixture
+def hash_calls(monkeypatch):
+    """Count password hash computations"""
+    calls = []
+    encode = PBKDF2PasswordHasher.encode
+    
+    def counting_encode(self, *args, **kwargs):
+        calls.append(args)
+        return encode(self, *args, **kwargs)
+    
+    monkeypatch.setattr(PBKDF2PasswordHasher, 'encode', counting_encode)
+    return calls
+
+
+@pytest.mark.django_db
+class TestFailedLogin:
+    
+    def test_wrong_password_hashes_once(self, hash_calls):
+        """Test a wrong password is only checked by one backend"""
+        User.objects.create_user(
+            email='patient@example.com',
+            password='password123',
+            first_name='John',
+            last_name='Doe',
+            date_of_birth='1990-01-01',
+            role='PATIENT'
+        )
+        hash_calls.clear()
+        
+        assert authenticate(username='patient@example.com', password='wrong') is None
+        assert len(hash_calls) == 1
+
+    def test_unknown_email_hashes_once(self, hash_calls):
+        """Test an unknown email runs the timing-safe dummy hash only once"""
+        assert authenticate(username='nobody@example.com', password='wrong') is None
+        assert len(hash_calls) == 1
@@ -107,7 +107,7 @@ class PatientRegistrationView(CreateView):
         
         # Auto login after registration.
         from django.contrib.auth import login
-        login(self.request, self.object, backend='django.contrib.auth.backends.ModelBackend')
+        login(self.request, self.object, backend='accounts.backends.ProfileModelBackend')
         
         # Send registration confirmation notification
         try:
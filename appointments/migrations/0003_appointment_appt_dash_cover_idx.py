@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-15 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0002_delete_patientform"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["doctor", "appointment_date", "status", "start_time"],
+                name="appt_dash_cover_idx",
+            ),
+        ),
+    ]
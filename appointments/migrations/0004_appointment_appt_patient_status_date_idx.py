@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-15 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0003_appointment_appt_dash_cover_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["patient", "status", "appointment_date"],
+                name="appt_patient_status_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-15 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0004_appointment_appt_patient_status_date_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["patient", "doctor", "appointment_date", "status"],
+                name="appt_checkin_idx",
+            ),
+        ),
+    ]
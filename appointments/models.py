@@ -71,6 +71,16 @@ class Appointment(models.Model):
         db_table = 'appointments'
         ordering = ['-appointment_date', '-start_time']
         unique_together = ['doctor', 'appointment_date', 'start_time']
+        indexes = [
+            # Serves the doctor/nurse "today" lists: filter on doctor, date
+            # and status, then read rows already ordered by start_time.
+            models.Index(fields=['doctor', 'appointment_date', 'status', 'start_time'], name='appt_dash_cover_idx'),
+            # Serves the patient's upcoming/past appointment lists.
+            models.Index(fields=['patient', 'status', 'appointment_date'], name='appt_patient_status_date_idx'),
+            # Serves the QR check-in lookup of a patient's appointment with one doctor on one day.
+            # The doctor-wide check-in filter (doctor, date, status) is a prefix of appt_dash_cover_idx.
+            models.Index(fields=['patient', 'doctor', 'appointment_date', 'status'], name='appt_checkin_idx'),
+        ]
     
     def __str__(self):
         try:
@@ -138,7 +138,8 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Authentication
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    # Replaces ModelBackend; sessions from before the switch log in again once
+    'accounts.backends.ProfileModelBackend',
 ]
 
 # Use the custom user model from the accounts app to avoid clashes with the
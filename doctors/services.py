@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from .models import Doctor
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DoctorService:
+    """
+    Service layer for doctor lookups.
+    """
+    
+    CHOICES_CACHE_KEY = 'doctors:choices:v1'
+    CHOICES_CACHE_TIMEOUT = 300
+    
+    @staticmethod
+    def get_doctor_choices():
+        """
+        Get (pk, label) pairs for every doctor, for use in select widgets.
+        The list is cached and cleared whenever a doctor, or a doctor's user, is saved
+        or deleted. The default cache is per-process, so other workers only pick up
+        the change once their copy expires after CHOICES_CACHE_TIMEOUT.
+        """
+        choices = cache.get(DoctorService.CHOICES_CACHE_KEY)
+        if choices is None:
+            doctors = Doctor.objects.select_related('user').only(
+                'specialization', 'user__first_name', 'user__last_name'
+            ).order_by('user__last_name', 'user__first_name')
+            choices = [(doctor.pk, str(doctor)) for doctor in doctors]
+            cache.set(DoctorService.CHOICES_CACHE_KEY, choices, DoctorService.CHOICES_CACHE_TIMEOUT)
+        return choices
+    
+    @staticmethod
+    def invalidate_doctor_choices():
+        """Drop the cached doctor choices."""
+        cache.delete(DoctorService.CHOICES_CACHE_KEY)
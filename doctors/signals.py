@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Doctor
+from .services import DoctorService
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def invalidate_doctor_choices(sender, **kwargs):
+    """Keep the cached booking choices in step with the doctors table"""
+    DoctorService.invalidate_doctor_choices()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_doctor_choices_for_user(sender, instance, update_fields=None, **kwargs):
+    """Doctor labels include the user's name, so renaming a doctor user refreshes them too"""
+    # Partial saves such as the last_login update on each login leave the name alone
+    if update_fields is not None and not {'first_name', 'last_name'} & update_fields:
+        return
+    if instance.is_doctor():
+        DoctorService.invalidate_doctor_choices()
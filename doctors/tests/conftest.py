@@ -6,6 +6,11 @@ from doctors.models import Doctor
 from appointments.models import DoctorAvailability
 from datetime import time
 
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Write generated QR images under a per-test directory instead of the repo's media/"""
+    settings.MEDIA_ROOT = tmp_path
+
 @pytest.fixture
 def client():
     return Client()
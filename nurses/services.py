@@ -16,6 +16,24 @@ class NurseService:
     Handles queue management and consultation tracking.
     """
     
+    # Columns rendered by the nurse queue tables; everything else stays deferred.
+    QUEUE_LIST_FIELDS = (
+        'id',
+        'queue',
+        'position',
+        'status',
+        'check_in_time',
+        'is_emergency',
+        'checkedin_via_qrcode',
+        'consultation_start_time',
+        'consultation_end_time',
+        'consultation_duration_minutes',
+        'patient__user__id',
+        'patient__user__first_name',
+        'patient__user__last_name',
+        'patient__user__phone',
+    )
+    
     @staticmethod
     def get_assigned_doctor_queue(nurse):
         """
@@ -39,7 +57,9 @@ class NurseService:
         if not queue:
             return PatientQueue.objects.none()
         
-        return queue.patient_queues.all().order_by('position')
+        return queue.patient_queues.select_related('patient__user').only(
+            *NurseService.QUEUE_LIST_FIELDS
+        ).order_by('position')
     
     @staticmethod
     def get_waiting_patients(queue):
@@ -49,7 +69,9 @@ class NurseService:
         if not queue:
             return PatientQueue.objects.none()
         
-        return queue.patient_queues.filter(status='WAITING').order_by('position')
+        return queue.patient_queues.filter(status='WAITING').select_related(
+            'patient__user'
+        ).only(*NurseService.QUEUE_LIST_FIELDS).order_by('position')
     
     @staticmethod
     def get_current_patient(queue):
@@ -70,13 +92,18 @@ class NurseService:
         if not queue:
             return False, "No queue available"
         
+        # Lock the queue row so two nurses cannot call patients concurrently
+        queue = Queue.objects.select_for_update().get(pk=queue.pk)
+        
         # Check if there's already a patient in progress
         current = NurseService.get_current_patient(queue)
         if current:
             return False, f"Please complete consultation with {current.patient} first"
         
         # Get next waiting patient
-        next_patient = queue.patient_queues.filter(
+        next_patient = queue.patient_queues.select_for_update(of=('self',)).select_related(
+            'patient__user'
+        ).filter(
             status='WAITING'
         ).order_by('position').first()
         
@@ -98,7 +125,9 @@ class NurseService:
         Start consultation for a specific patient.
         """
         try:
-            patient_queue = PatientQueue.objects.get(pk=patient_queue_id)
+            patient_queue = PatientQueue.objects.select_for_update(of=('self',)).select_related(
+                'patient__user', 'queue'
+            ).get(pk=patient_queue_id)
             
             if patient_queue.status != 'WAITING':
                 return False, "Patient is not in waiting status"
@@ -136,13 +165,18 @@ class NurseService:
         End consultation for a specific patient.
         """
         try:
-            patient_queue = PatientQueue.objects.get(pk=patient_queue_id)
+            patient_queue = PatientQueue.objects.select_for_update(of=('self',)).select_related(
+                'patient__user', 'queue'
+            ).get(pk=patient_queue_id)
             
             if patient_queue.status != 'IN_PROGRESS':
                 return False, "Patient is not in consultation"
             
             patient_queue.status = 'TERMINATED'
             patient_queue.consultation_end_time = timezone.now()
+            if patient_queue.consultation_start_time:
+                delta = patient_queue.consultation_end_time - patient_queue.consultation_start_time
+                patient_queue.consultation_duration_minutes = int(delta.total_seconds() // 60)
             patient_queue.save()
             
             # Update appointment status if exists
@@ -174,7 +208,9 @@ class NurseService:
         Mark a patient as no-show.
         """
         try:
-            patient_queue = PatientQueue.objects.get(pk=patient_queue_id)
+            patient_queue = PatientQueue.objects.select_for_update(of=('self',)).select_related(
+                'patient__user', 'queue'
+            ).get(pk=patient_queue_id)
             
             if patient_queue.status not in ['WAITING', 'EMERGENCY']:
                 return False, "Can only mark waiting patients as no-show"
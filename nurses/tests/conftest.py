@@ -0,0 +1,70 @@
+import pytest
+from django.test import Client
+from django.utils import timezone
+from accounts.models import User
+from patients.models import Patient
+from doctors.models import Doctor
+from nurses.models import Nurse
+from queues.models import Queue, PatientQueue
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Write generated QR images under a per-test directory instead of the repo's media/"""
+    settings.MEDIA_ROOT = tmp_path
+
+@pytest.fixture
+def client():
+    return Client()
+
+@pytest.fixture
+def doctor(db):
+    user = User.objects.create_user(
+        email='doctor@example.com',
+        password='password123',
+        first_name='Jane',
+        last_name='Smith',
+        date_of_birth='1980-01-01',
+        role='DOCTOR',
+        phone='0921234567'
+    )
+    return Doctor.objects.create(
+        user=user,
+        specialization='CARDIOLOGY',
+        license_number='LIC12345'
+    )
+
+@pytest.fixture
+def nurse(doctor):
+    user = User.objects.create_user(
+        email='nurse@example.com',
+        password='password123',
+        first_name='Nina',
+        last_name='Nurse',
+        date_of_birth='1985-01-01',
+        role='NURSE',
+        phone='0931234567'
+    )
+    return Nurse.objects.create(user=user, assigned_doctor=doctor)
+
+@pytest.fixture
+def nurse_client(client, nurse):
+    client.force_login(nurse.user)
+    return client
+
+@pytest.fixture
+def queue(doctor):
+    return Queue.objects.create(doctor=doctor, date=timezone.now().date())
+
+@pytest.fixture
+def waiting_entry(queue):
+    user = User.objects.create_user(
+        email='patient@example.com',
+        password='password123',
+        first_name='John',
+        last_name='Doe',
+        date_of_birth='1990-01-01',
+        role='PATIENT',
+        phone='0911234567'
+    )
+    patient = Patient.objects.create(user=user)
+    return PatientQueue.objects.create(queue=queue, patient=patient, status='WAITING')
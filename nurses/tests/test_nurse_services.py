@@ -0,0 +1,31 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from nurses.services import NurseService
+
+
+@pytest.mark.django_db
+class TestEndConsultation:
+    
+    def test_end_consultation_stores_duration(self, waiting_entry):
+        """Test ending a consultation saves its length in whole minutes"""
+        waiting_entry.status = 'IN_PROGRESS'
+        waiting_entry.consultation_start_time = timezone.now() - timedelta(minutes=12, seconds=30)
+        waiting_entry.save()
+        
+        success, entry = NurseService.end_consultation(waiting_entry.pk)
+        
+        assert success
+        entry.refresh_from_db()
+        assert entry.status == 'TERMINATED'
+        assert entry.consultation_duration_minutes == 12
+        assert entry.get_consultation_duration() == 12
+
+    def test_end_consultation_requires_in_progress(self, waiting_entry):
+        """Test a waiting patient cannot have their consultation ended"""
+        success, message = NurseService.end_consultation(waiting_entry.pk)
+        
+        assert not success
+        assert message == 'Patient is not in consultation'
+        waiting_entry.refresh_from_db()
+        assert waiting_entry.consultation_duration_minutes is None
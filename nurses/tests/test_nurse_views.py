@@ -0,0 +1,47 @@
+import pytest
+from django.contrib.messages import get_messages
+from django.urls import reverse
+
+
+@pytest.mark.django_db
+class TestNurseActionResponses:
+    
+    def test_form_post_redirects_with_message(self, nurse_client, waiting_entry):
+        """Test a regular form post flashes the result and redirects to queue management"""
+        url = reverse('nurses:start_consultation', args=[waiting_entry.pk])
+        response = nurse_client.post(url)
+        
+        assert response.status_code == 302
+        assert response.url == reverse('nurses:queue_management')
+        messages = [str(message) for message in get_messages(response.wsgi_request)]
+        assert messages == ['Consultation started for: John Doe']
+        waiting_entry.refresh_from_db()
+        assert waiting_entry.status == 'IN_PROGRESS'
+
+    @pytest.mark.parametrize('headers', [
+        {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'},
+        {'HTTP_HX_REQUEST': 'true'},
+    ])
+    def test_ajax_post_returns_json(self, nurse_client, waiting_entry, headers):
+        """Test fetch and htmx callers get a JSON body instead of a redirect"""
+        url = reverse('nurses:start_consultation', args=[waiting_entry.pk])
+        response = nurse_client.post(url, **headers)
+        
+        assert response.status_code == 200
+        assert response.json() == {'ok': True, 'message': 'Consultation started for: John Doe'}
+        assert not list(get_messages(response.wsgi_request))
+
+    def test_ajax_failure_returns_400(self, nurse_client, waiting_entry):
+        """Test a refused action is reported as a 400 with the reason"""
+        url = reverse('nurses:end_consultation', args=[waiting_entry.pk])
+        response = nurse_client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        
+        assert response.status_code == 400
+        assert response.json() == {'ok': False, 'message': 'Patient is not in consultation'}
+
+    def test_ajax_call_next_with_empty_queue(self, nurse_client, queue):
+        """Test a warning result also counts as a failure for AJAX callers"""
+        response = nurse_client.post(reverse('nurses:call_next_patient'), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        
+        assert response.status_code == 400
+        assert response.json() == {'ok': False, 'message': 'No patients waiting in queue'}
@@ -5,8 +5,10 @@ Uses class-based views following the project's existing patterns.
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView, View
 from django.shortcuts import redirect, get_object_or_404
+from django.http import JsonResponse
 from django.contrib import messages
 from django.utils import timezone
+from django.utils.translation import gettext as _
 
 from .models import Nurse
 from .services import NurseService
@@ -23,6 +25,29 @@ class NurseRequiredMixin(UserPassesTestMixin):
     def handle_no_permission(self):
         messages.error(self.request, 'Only nurses can access this page')
         return redirect('accounts:login')
+    
+    def is_ajax(self):
+        """True for fetch/XHR and htmx requests that update the page themselves."""
+        headers = self.request.headers
+        return headers.get('X-Requested-With') == 'XMLHttpRequest' or 'HX-Request' in headers
+    
+    def action_response(self, level, message):
+        """
+        Respond to a queue action.
+        AJAX callers get JSON; regular form posts get a flash message and a redirect.
+        """
+        if self.is_ajax():
+            success = level == messages.SUCCESS
+            return JsonResponse({'ok': success, 'message': message}, status=200 if success else 400)
+        
+        messages.add_message(self.request, level, message)
+        return redirect('nurses:queue_management')
+    
+    def get_nurse(self):
+        """Return the current user's nurse profile, or None if it is missing."""
+        return Nurse.objects.select_related('assigned_doctor__user').filter(
+            user=self.request.user
+        ).first()
 
 
 class NurseDashboardView(LoginRequiredMixin, NurseRequiredMixin, TemplateView):
@@ -35,9 +60,8 @@ class NurseDashboardView(LoginRequiredMixin, NurseRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        try:
-            nurse = self.request.user.nurse_profile
-        except Nurse.DoesNotExist:
+        nurse = self.get_nurse()
+        if nurse is None:
             context['error'] = 'Nurse profile not found. Please contact administrator.'
             return context
         
@@ -76,9 +100,8 @@ class QueueManagementView(LoginRequiredMixin, NurseRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        try:
-            nurse = self.request.user.nurse_profile
-        except Nurse.DoesNotExist:
+        nurse = self.get_nurse()
+        if nurse is None:
             context['error'] = 'Nurse profile not found'
             return context
         
@@ -105,26 +128,24 @@ class CallNextPatientView(LoginRequiredMixin, NurseRequiredMixin, View):
     """
     
     def post(self, request, *args, **kwargs):
+        nurse = self.get_nurse()
+        if nurse is None:
+            return self.action_response(messages.ERROR, 'Nurse profile not found')
+        
         try:
-            nurse = request.user.nurse_profile
             queue = NurseService.get_assigned_doctor_queue(nurse)
             
             success, result = NurseService.call_next_patient(queue)
             
             if success:
-                messages.success(
-                    request, 
-                    f'Called patient: {result.patient.user.get_full_name()}'
+                return self.action_response(
+                    messages.SUCCESS,
+                    _('Called patient: %(name)s') % {'name': result.patient.user.get_full_name()}
                 )
-            else:
-                messages.warning(request, result)
+            return self.action_response(messages.WARNING, result)
                 
-        except Nurse.DoesNotExist:
-            messages.error(request, 'Nurse profile not found')
         except Exception as e:
-            messages.error(request, f'Error calling next patient: {str(e)}')
-        
-        return redirect('nurses:queue_management')
+            return self.action_response(messages.ERROR, f'Error calling next patient: {str(e)}')
 
 
 class StartConsultationView(LoginRequiredMixin, NurseRequiredMixin, View):
@@ -137,17 +158,14 @@ class StartConsultationView(LoginRequiredMixin, NurseRequiredMixin, View):
             success, result = NurseService.start_consultation(pk)
             
             if success:
-                messages.success(
-                    request, 
-                    f'Consultation started for: {result.patient.user.get_full_name()}'
+                return self.action_response(
+                    messages.SUCCESS,
+                    _('Consultation started for: %(name)s') % {'name': result.patient.user.get_full_name()}
                 )
-            else:
-                messages.error(request, result)
+            return self.action_response(messages.ERROR, result)
                 
         except Exception as e:
-            messages.error(request, f'Error starting consultation: {str(e)}')
-        
-        return redirect('nurses:queue_management')
+            return self.action_response(messages.ERROR, f'Error starting consultation: {str(e)}')
 
 
 class EndConsultationView(LoginRequiredMixin, NurseRequiredMixin, View):
@@ -161,18 +179,17 @@ class EndConsultationView(LoginRequiredMixin, NurseRequiredMixin, View):
             
             if success:
                 duration = result.get_consultation_duration()
-                messages.success(
-                    request, 
-                    f'Consultation ended for: {result.patient.user.get_full_name()} '
-                    f'(Duration: {duration} minutes)'
+                return self.action_response(
+                    messages.SUCCESS,
+                    _('Consultation ended for: %(name)s (Duration: %(duration)s minutes)') % {
+                        'name': result.patient.user.get_full_name(),
+                        'duration': duration,
+                    }
                 )
-            else:
-                messages.error(request, result)
+            return self.action_response(messages.ERROR, result)
                 
         except Exception as e:
-            messages.error(request, f'Error ending consultation: {str(e)}')
-        
-        return redirect('nurses:queue_management')
+            return self.action_response(messages.ERROR, f'Error ending consultation: {str(e)}')
 
 
 class MarkNoShowView(LoginRequiredMixin, NurseRequiredMixin, View):
@@ -185,14 +202,11 @@ class MarkNoShowView(LoginRequiredMixin, NurseRequiredMixin, View):
             success, result = NurseService.mark_no_show(pk)
             
             if success:
-                messages.success(
-                    request, 
-                    f'Patient marked as no-show: {result.patient.user.get_full_name()}'
+                return self.action_response(
+                    messages.SUCCESS,
+                    _('Patient marked as no-show: %(name)s') % {'name': result.patient.user.get_full_name()}
                 )
-            else:
-                messages.error(request, result)
+            return self.action_response(messages.ERROR, result)
                 
         except Exception as e:
-            messages.error(request, f'Error marking no-show: {str(e)}')
-        
-        return redirect('nurses:queue_management')
+            return self.action_response(messages.ERROR, f'Error marking no-show: {str(e)}')
@@ -1,8 +1,12 @@
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta, datetime
 from appointments.models import Appointment
+from doctors.services import DoctorService
 
 @pytest.mark.django_db
 class TestBookingAppointment:
@@ -100,3 +104,35 @@ class TestBookingAppointment:
         
         assert response.status_code == 200 # Form invalid
         assert Appointment.objects.count() == 0
+
+    def test_book_appointment_doctor_choices_cached(self, authenticated_patient_client, doctor):
+        """Test the doctor options are served from the cache and refreshed on doctor changes"""
+        url = reverse('patients:book_appointment')
+        authenticated_patient_client.get(url)
+        
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_patient_client.get(url)
+        
+        choices = list(response.context['form'].fields['doctor'].choices)
+        assert (doctor.pk, str(doctor)) in choices
+        assert not any('FROM "doctors"' in query['sql'] for query in context.captured_queries)
+        
+        doctor.specialization = 'NEUROLOGY'
+        doctor.save()
+        
+        response = authenticated_patient_client.get(url)
+        assert 'Neurology' in response.content.decode()
+        
+        doctor.user.last_name = 'Renamed'
+        doctor.user.save()
+        
+        response = authenticated_patient_client.get(url)
+        assert 'Renamed' in response.content.decode()
+
+    def test_doctor_login_keeps_doctor_choices_cached(self, client, doctor):
+        """Test a doctor logging in, which only saves last_login, leaves the cached choices alone"""
+        DoctorService.get_doctor_choices()
+        
+        client.force_login(doctor.user)
+        
+        assert cache.get(DoctorService.CHOICES_CACHE_KEY) is not None
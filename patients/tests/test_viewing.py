@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta, time
@@ -45,3 +47,77 @@ class TestViewingAppointments:
         # Should see both (if today is >= today)
         upcoming = response.context['upcoming_appointments']
         assert len(upcoming) == 2
+
+    def test_patient_view_appointments_query_count(self, authenticated_patient_client, appointments, patient, doctor):
+        """Test that the appointment lists do not issue a query per row"""
+        url = reverse('patients:my_appointments')
+        with CaptureQueriesContext(connection) as baseline:
+            authenticated_patient_client.get(url)
+        
+        today = timezone.now().date()
+        for days in range(2, 5):
+            appointment = Appointment.objects.create(
+                patient=patient,
+                doctor=doctor,
+                appointment_date=today + timedelta(days=days),
+                start_time=time(9, 0),
+                end_time=time(9, 30),
+                status='SCHEDULED'
+            )
+        
+        # Move the last one into the past list
+        Appointment.objects.filter(pk=appointment.pk).update(
+            appointment_date=today - timedelta(days=1),
+            status='COMPLETED'
+        )
+        
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_patient_client.get(url)
+        
+        assert len(response.context['upcoming_appointments']) == 4
+        assert len(response.context['past_appointments']) == 1
+        assert len(context.captured_queries) == len(baseline.captured_queries)
+
+    def test_patient_bulk_cancel_ignores_invalid_ids(self, authenticated_patient_client, appointments):
+        """Test bulk cancellation skips ids that are not integers"""
+        url = reverse('patients:my_appointments')
+        response = authenticated_patient_client.post(url, {
+            'appointment_ids': [str(appointments[0].pk), 'abc', '', '²', str(10 ** 30)]
+        })
+        
+        assert response.status_code == 302
+        appointments[0].refresh_from_db()
+        appointments[1].refresh_from_db()
+        assert appointments[0].status == 'CANCELLED'
+        assert appointments[1].status == 'SCHEDULED'
+
+    def test_patient_view_past_appointments_latest_first(self, authenticated_patient_client, appointments, patient, doctor):
+        """Test the past list keeps only the ten most recent appointments, newest first"""
+        today = timezone.now().date()
+        for days in range(1, 13):
+            Appointment.objects.create(
+                patient=patient,
+                doctor=doctor,
+                appointment_date=today + timedelta(days=days + 1),
+                start_time=time(9, 0),
+                end_time=time(9, 30),
+                status='SCHEDULED'
+            )
+        Appointment.objects.filter(patient=patient, start_time=time(9, 0)).update(status='COMPLETED')
+        
+        response = authenticated_patient_client.get(reverse('patients:my_appointments'))
+        
+        past_dates = [a.appointment_date for a in response.context['past_appointments']]
+        assert len(past_dates) == 10
+        assert past_dates == sorted(past_dates, reverse=True)
+        assert past_dates[0] == today + timedelta(days=13)
+        assert len(response.context['upcoming_appointments']) == 2
+
+    def test_patient_profile_loaded_with_user(self, authenticated_patient_client, appointments):
+        """Test the patient profile comes with the session user instead of its own query"""
+        url = reverse('patients:my_appointments')
+        with CaptureQueriesContext(connection) as context:
+            authenticated_patient_client.post(url, {'appointment_ids': [str(appointments[0].pk)]})
+        
+        profile_queries = [q for q in context.captured_queries if 'FROM "patients"' in q['sql']]
+        assert profile_queries == []
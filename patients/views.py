@@ -8,11 +8,16 @@ from django.contrib import messages
 from django.views.generic import CreateView, ListView, View
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.functional import cached_property
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
 from django import forms
 from datetime import datetime
+from functools import partial
 
 from appointments.models import Appointment
 from doctors.models import Doctor
+from doctors.services import DoctorService
 from accounts.notifications import NotificationService
 from appointments.services import AppointmentService
 from .models import PatientForm
@@ -28,6 +33,11 @@ class PatientRequiredMixin(UserPassesTestMixin):
     def handle_no_permission(self):
         messages.error(self.request, 'Only patients can access this page')
         return redirect('accounts:login')
+    
+    @cached_property
+    def patient_profile(self):
+        """The current user's patient profile, loaded once per request."""
+        return self.request.user.patient_profile
 
 
 class BookAppointmentView(LoginRequiredMixin, PatientRequiredMixin, CreateView):
@@ -43,10 +53,11 @@ class BookAppointmentView(LoginRequiredMixin, PatientRequiredMixin, CreateView):
         """Customize the form inline"""
         form = super().get_form(form_class)
         
-        # Customize doctor field
-        form.fields['doctor'].queryset = Doctor.objects.all()
-        form.fields['doctor'].label_from_instance = lambda obj: f"Dr. {obj.user.get_full_name()} - {obj.get_specialization_display()}"
-        form.fields['doctor'].widget.attrs.update({'class': 'form-control'})
+        # Customize doctor field; options come from the cache, the queryset only validates
+        doctor_field = form.fields['doctor']
+        doctor_field.queryset = Doctor.objects.select_related('user')
+        doctor_field.choices = [('', doctor_field.empty_label)] + DoctorService.get_doctor_choices()
+        doctor_field.widget.attrs.update({'class': 'form-control'})
         
         # Customize date field
         form.fields['appointment_date'].widget = forms.DateInput(attrs={
@@ -75,7 +86,7 @@ class BookAppointmentView(LoginRequiredMixin, PatientRequiredMixin, CreateView):
     
     def form_valid(self, form):
         """Handle successful booking"""
-        patient = self.request.user.patient_profile
+        patient = self.patient_profile
         doctor = form.cleaned_data['doctor']
         appointment_date = form.cleaned_data['appointment_date']
         start_time = form.cleaned_data['start_time']
@@ -91,24 +102,18 @@ class BookAppointmentView(LoginRequiredMixin, PatientRequiredMixin, CreateView):
         )
         
         if success:
-            # Send notifications to both patient and doctor
-            try:
-                NotificationService.send_booking_confirmation(
-                    self.request.user,
-                    doctor_name=f"Dr. {doctor.user.get_full_name()}",
-                    date=appointment_date.strftime('%Y-%m-%d'),
-                    time=start_time.strftime('%I:%M %p')
-                )
-                NotificationService.send_new_appointment_notification(
-                    doctor.user,
-                    patient_name=patient.user.get_full_name(),
-                    date=appointment_date.strftime('%Y-%m-%d'),
-                    time=start_time.strftime('%I:%M %p')
-                )
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to send booking notifications: {e}")
+            # Format once for both notices; isoformat and a fixed AM/PM skip strftime's locale handling
+            hour = start_time.hour
+            time_str = f"{(hour - 1) % 12 + 1:02d}:{start_time.minute:02d} {'AM' if hour < 12 else 'PM'}"
+            
+            # Notify patient and doctor once the booking is committed
+            transaction.on_commit(partial(
+                NotificationService.send_booking_notifications,
+                self.request.user,
+                doctor.user,
+                date=appointment_date.isoformat(),
+                time=time_str
+            ))
             
             messages.success(self.request, 'Appointment booked successfully!')
             return redirect(self.success_url)
@@ -118,7 +123,7 @@ class BookAppointmentView(LoginRequiredMixin, PatientRequiredMixin, CreateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['doctors'] = Doctor.objects.all()
+        context['doctors'] = DoctorService.get_doctor_choices()
         return context
 
 
@@ -128,29 +133,68 @@ class MyAppointmentsView(LoginRequiredMixin, PatientRequiredMixin, ListView):
     template_name = 'patients/my_appointments.html'
     context_object_name = 'upcoming_appointments'
     
+    # Columns rendered by the appointment tables
+    LIST_FIELDS = (
+        'id',
+        'doctor',
+        'appointment_date',
+        'start_time',
+        'status',
+        'notes',
+        'doctor__specialization',
+        'doctor__user__first_name',
+        'doctor__user__last_name',
+    )
+    UPCOMING_STATUSES = ['SCHEDULED', 'CHECKED_IN']
+    PAST_STATUSES = ['COMPLETED', 'CANCELLED', 'NO_SHOW']
+    PAST_LIMIT = 10
+    
+    def get_appointments(self):
+        """
+        Load upcoming and past appointments in one query and split them by kind.
+        Upcoming ones are soonest first; only the latest PAST_LIMIT past ones are kept.
+        """
+        today = timezone.now().date()
+        appointments = Appointment.objects.select_related('doctor__user').only(
+            *self.LIST_FIELDS
+        ).filter(
+            Q(status__in=self.UPCOMING_STATUSES, appointment_date__gte=today)
+            | Q(status__in=self.PAST_STATUSES),
+            patient=self.patient_profile
+        ).annotate(
+            kind=Case(
+                When(status__in=self.PAST_STATUSES, then=Value('past')),
+                default=Value('upcoming'),
+            )
+        ).order_by('appointment_date', 'start_time')
+        
+        upcoming, past = [], []
+        for appointment in appointments:
+            (past if appointment.kind == 'past' else upcoming).append(appointment)
+        past.reverse()
+        return upcoming, past[:self.PAST_LIMIT]
+    
     def get_queryset(self):
         """Get only upcoming appointments"""
-        return Appointment.objects.filter(
-            patient=self.request.user.patient_profile,
-            status__in=['SCHEDULED', 'CHECKED_IN'],
-            appointment_date__gte=timezone.now().date()
-        ).order_by('appointment_date', 'start_time')
+        upcoming, self.past_appointments = self.get_appointments()
+        return upcoming
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['past_appointments'] = Appointment.objects.filter(
-            patient=self.request.user.patient_profile,
-            status__in=['COMPLETED', 'CANCELLED', 'NO_SHOW']
-        ).order_by('-appointment_date', '-start_time')[:10]
+        context['past_appointments'] = self.past_appointments
         return context
     
     def post(self, request, *args, **kwargs):
         """Handle bulk appointment cancellation"""
-        appointment_ids = request.POST.getlist('appointment_ids')
+        # Ignore anything that is not a plain in-range id so the IN clause stays all integers
+        appointment_ids = [
+            int(value) for value in request.POST.getlist('appointment_ids')
+            if value.isascii() and value.isdigit() and 0 < int(value) < 2 ** 63
+        ]
         if appointment_ids:
             deleted_count = Appointment.objects.filter(
                 id__in=appointment_ids,
-                patient=request.user.patient_profile,
+                patient=self.patient_profile,
                 status='SCHEDULED'
             ).update(status='CANCELLED')
             
@@ -171,7 +215,7 @@ class ModifyAppointmentView(LoginRequiredMixin, PatientRequiredMixin, View):
             appointment = get_object_or_404(
                 Appointment,
                 pk=pk,
-                patient=request.user.patient_profile,
+                patient=self.patient_profile,
                 status='SCHEDULED'
             )
             return self.render_form(request, appointment)
@@ -184,7 +228,7 @@ class ModifyAppointmentView(LoginRequiredMixin, PatientRequiredMixin, View):
             appointment = get_object_or_404(
                 Appointment,
                 pk=pk,
-                patient=request.user.patient_profile,
+                patient=self.patient_profile,
                 status='SCHEDULED'
             )
             
@@ -197,19 +241,20 @@ class ModifyAppointmentView(LoginRequiredMixin, PatientRequiredMixin, View):
             
             success, result = AppointmentService.modify_appointment(
                 pk,
-                request.user.patient_profile,
+                self.patient_profile,
                 new_date=new_date,
                 new_time=new_time,
                 notes=notes
             )
             
             if success:
-                NotificationService.send_booking_confirmation(
+                transaction.on_commit(partial(
+                    NotificationService.send_booking_confirmation,
                     request.user,
                     result.doctor.user.get_full_name(),
-                    result.appointment_date.strftime('%Y-%m-%d'),
-                    result.start_time.strftime('%H:%M')
-                )
+                    result.appointment_date.isoformat(),
+                    result.start_time.isoformat(timespec='minutes')
+                ))
                 messages.success(request, 'Appointment modified successfully')
                 return redirect('patients:my_appointments')
             else:
@@ -235,7 +280,7 @@ class CancelAppointmentView(LoginRequiredMixin, PatientRequiredMixin, View):
         try:
             success, message = AppointmentService.cancel_appointment(
                 pk,
-                request.user.patient_profile
+                self.patient_profile
             )
             
             if success:
@@ -254,7 +299,7 @@ class SubmitPatientFormView(LoginRequiredMixin, PatientRequiredMixin, View):
     template_name = 'patients/submit_patient_form.html'
     
     def get(self, request):
-        patient_form = PatientForm.objects.filter(patient=request.user.patient_profile).first()
+        patient_form = PatientForm.objects.filter(patient=self.patient_profile).first()
         return render(request, self.template_name, {'patient_form': patient_form})
     
     def post(self, request):
@@ -266,11 +311,11 @@ class SubmitPatientFormView(LoginRequiredMixin, PatientRequiredMixin, View):
             
             if not chief_complaint:
                 messages.error(request, 'Chief complaint is required')
-                patient_form = PatientForm.objects.filter(patient=request.user.patient_profile).first()
+                patient_form = PatientForm.objects.filter(patient=self.patient_profile).first()
                 return render(request, self.template_name, {'patient_form': patient_form})
             
             success, result = PatientFormService.submit_form(
-                request.user.patient_profile,
+                self.patient_profile,
                 chief_complaint,
                 medical_history,
                 current_medications,
@@ -282,10 +327,10 @@ class SubmitPatientFormView(LoginRequiredMixin, PatientRequiredMixin, View):
                 return redirect('patients:my_appointments')
             else:
                 messages.error(request, result)
-                patient_form = PatientForm.objects.filter(patient=request.user.patient_profile).first()
+                patient_form = PatientForm.objects.filter(patient=self.patient_profile).first()
                 return render(request, self.template_name, {'patient_form': patient_form})
                 
         except Exception as e:
             messages.error(request, f'Error submitting form: {str(e)}')
-            patient_form = PatientForm.objects.filter(patient=request.user.patient_profile).first()
+            patient_form = PatientForm.objects.filter(patient=self.patient_profile).first()
             return render(request, self.template_name, {'patient_form': patient_form})
\ No newline at end of file
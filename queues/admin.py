@@ -1,12 +1,32 @@
 from django.contrib import admin
+from django.db.models import Count
+from django.utils.html import format_html
 from .models import Queue, PatientQueue
 
 @admin.register(Queue)
 class QueueAdmin(admin.ModelAdmin):
-    list_display = ('doctor', 'date', 'created_at', 'qrcode')
+    list_display = ('doctor', 'date', 'get_size', 'created_at', 'get_qrcode_link')
     readonly_fields = ('qrcode', 'qrcode_image', 'qrcode_generated_at')
+    list_select_related = ('doctor__user',)
+    
+    def get_queryset(self, request):
+        # Count patients for every listed queue in the same query
+        return super().get_queryset(request).annotate(size=Count('patient_queues'))
+    
+    def get_size(self, obj):
+        return obj.size
+    get_size.short_description = 'Patients'
+    get_size.admin_order_field = 'size'
+    
+    def get_qrcode_link(self, obj):
+        if not obj.qrcode_url:
+            return obj.qrcode or '-'
+        return format_html('<a href="{}" target="_blank">{}</a>', obj.qrcode_url, obj.qrcode)
+    get_qrcode_link.short_description = 'QR code'
+    get_qrcode_link.admin_order_field = 'qrcode'
 
 @admin.register(PatientQueue)
 class PatientQueueAdmin(admin.ModelAdmin):
     list_display = ('patient', 'queue', 'position', 'status', 'estimated_time')
     list_filter = ('status', 'queue__doctor')
+    list_select_related = ('patient__user', 'queue__doctor__user')
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-15 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("queues", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="patientqueue",
+            name="consultation_duration_minutes",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
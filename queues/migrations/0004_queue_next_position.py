@@ -0,0 +1,31 @@
+# Generated by Django 5.0.14 on 2026-10-15 23:00
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def backfill_next_position(apps, schema_editor):
+    Queue = apps.get_model("queues", "Queue")
+    for queue in Queue.objects.annotate(last_position=Max("patient_queues__position")):
+        if queue.last_position:
+            Queue.objects.filter(pk=queue.pk).update(next_position=queue.last_position)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("queues", "0002_patientqueue_consultation_duration_minutes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="queue",
+            name="next_position",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Last position handed out in this queue",
+            ),
+        ),
+        migrations.RunPython(backfill_next_position, migrations.RunPython.noop),
+    ]
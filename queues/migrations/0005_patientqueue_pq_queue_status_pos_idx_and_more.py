@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-15 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("queues", "0004_queue_next_position"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="patientqueue",
+            index=models.Index(
+                fields=["queue", "status", "position"], name="pq_queue_status_pos_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="patientqueue",
+            index=models.Index(fields=["queue", "position"], name="pq_queue_pos_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-15 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("queues", "0005_patientqueue_pq_queue_status_pos_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="queue",
+            name="qrcode_image",
+            field=models.FileField(blank=True, null=True, upload_to="qr_codes/"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-15 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("queues", "0006_alter_queue_qrcode_image"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="patientqueue",
+            constraint=models.UniqueConstraint(
+                fields=("queue", "patient"), name="uniq_queue_patient"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="patientqueue",
+            unique_together=set(),
+        ),
+    ]
@@ -1,21 +1,50 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
+from django.utils.functional import cached_property
 from doctors.models import Doctor
 from patients.models import Patient
+import functools
 import qrcode
+from qrcode.image.svg import SvgPathImage
 from io import BytesIO
-from django.core.files import File
-from PIL import Image
+from django.core.files.base import ContentFile
+
+
+@functools.lru_cache(maxsize=1024)
+def _render_qr_svg(qr_data):
+    """
+    Render QR code data to SVG bytes.
+    The data is deterministic per doctor and date, so results are memoized.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+        image_factory=SvgPathImage,
+    )
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+
+    img = qr.make_image()
+    
+    # Save image to BytesIO buffer
+    buffer = BytesIO()
+    img.save(buffer)
+    return buffer.getvalue()
 
 class Queue(models.Model):
     """
     Represents a queue for a specific doctor on a specific date.
     """
+    MINUTES_PER_PATIENT = 30
+    
     doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='queues')
     date = models.DateField(default=timezone.now)
     qrcode = models.CharField(max_length=255, blank=True, null=True, help_text="String representation of the QR code data")
-    qrcode_image = models.ImageField(upload_to='qr_codes/', blank=True, null=True)
+    qrcode_image = models.FileField(upload_to='qr_codes/', blank=True, null=True)
     qrcode_generated_at = models.DateTimeField(blank=True, null=True)
+    next_position = models.PositiveIntegerField(default=0, editable=False, help_text="Last position handed out in this queue")
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -38,38 +67,37 @@ class Queue(models.Model):
         self.qrcode = qr_data
         self.qrcode_generated_at = timezone.now()
 
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Save image to BytesIO buffer
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        file_name = f"qr_queue_{self.doctor.pk}_{self.date.strftime('%Y%m%d')}.png"
+        file_name = f"qr_queue_{self.doctor.pk}_{self.date.strftime('%Y%m%d')}.svg"
         
         # Save image file to the model field
-        self.qrcode_image.save(file_name, File(buffer), save=False)
+        self.qrcode_image.save(file_name, ContentFile(_render_qr_svg(qr_data)), save=False)
+        self.__dict__.pop('qrcode_url', None)
 
     def save(self, *args, **kwargs):
         if not self.qrcode_image:
             self.generate_qrcode()
         super().save(*args, **kwargs)
 
-    def get_size(self):
+    @cached_property
+    def size(self):
+        """
+        Number of patients in the queue, counted once per instance.
+        Querysets can prefill it with .annotate(size=Count('patient_queues')).
+        """
         return self.patient_queues.count()
 
+    def get_size(self):
+        return self.size
+
     def is_empty(self):
-        return self.patient_queues.count() == 0
+        # Reuse a count we already have; otherwise stop at the first row
+        if 'size' in self.__dict__:
+            return self.size == 0
+        return not self.patient_queues.exists()
     
     def get_estimated_wait_time(self, position):
-        return position * 30
+        # Keep linear in position: the bulk shifts in PatientQueue recompute it in SQL
+        return position * self.MINUTES_PER_PATIENT
     
     def enqueue(self, patient_id):
         """
@@ -90,19 +118,58 @@ class Queue(models.Model):
         
         return patient_queue
     
+    def enqueue_many(self, patient_ids, via_qrcode=False):
+        """
+        Add several patients to the queue with a single bulk INSERT.
+        Positions are claimed from the queue counter as one block, in the given order.
+        """
+        patient_ids = list(patient_ids)
+        if not patient_ids:
+            return []
+        
+        with transaction.atomic():
+            Queue.objects.filter(pk=self.pk).update(
+                next_position=models.F('next_position') + len(patient_ids)
+            )
+            self.next_position = Queue.objects.values_list('next_position', flat=True).get(pk=self.pk)
+            first_position = self.next_position - len(patient_ids) + 1
+            
+            entries = [
+                PatientQueue(
+                    queue=self,
+                    patient_id=patient_id,
+                    position=position,
+                    estimated_time=self.get_estimated_wait_time(position),
+                    status='WAITING',
+                    checkedin_via_qrcode=via_qrcode
+                )
+                for position, patient_id in enumerate(patient_ids, start=first_position)
+            ]
+            entries = PatientQueue.objects.bulk_create(entries, batch_size=500)
+        
+        if 'size' in self.__dict__:
+            self.size += len(entries)
+        return entries
+    
     def dequeue(self):
         """
         Remove and return the next patient from the queue (FIFO).
         """
-        next_patient = self.patient_queues.filter(
-            status='WAITING'
-        ).order_by('position').first()
-        
-        if next_patient:
-            next_patient.status = 'IN_PROGRESS'
-            next_patient.save()
+        waiting = self.patient_queues.filter(status='WAITING').order_by('position')
         
-        return next_patient
+        while True:
+            next_pk = waiting.values_list('pk', flat=True).first()
+            if next_pk is None:
+                return None
+            
+            now = timezone.now()
+            # Claim the row with a guarded UPDATE; 0 rows means another caller took it
+            claimed = PatientQueue.objects.filter(pk=next_pk, status='WAITING').update(
+                status='IN_PROGRESS',
+                consultation_start_time=now
+            )
+            if claimed:
+                return PatientQueue.objects.select_related('patient__user').get(pk=next_pk)
     
     def validate_qrcode(self, code):
         """
@@ -110,13 +177,21 @@ class Queue(models.Model):
         """
         return self.qrcode == code
     
-    def get_qrcode_image(self):
+    @cached_property
+    def qrcode_url(self):
         """
-        Get the QR code image URL.
+        QR code image URL, resolved once per instance.
+        Storage backends may sign URLs, so list pages should not rebuild it per access.
         """
         if self.qrcode_image:
             return self.qrcode_image.url
         return ""
+    
+    def get_qrcode_image(self):
+        """
+        Get the QR code image URL.
+        """
+        return self.qrcode_url
 
 
 class PatientQueue(models.Model):
@@ -139,30 +214,48 @@ class PatientQueue(models.Model):
     is_emergency = models.BooleanField(default=False)
     checkedin_via_qrcode = models.BooleanField(default=False)
     
-    checkedin_via_qrcode = models.BooleanField(default=False)
-    
     consultation_start_time = models.DateTimeField(null=True, blank=True)
     consultation_end_time = models.DateTimeField(null=True, blank=True)
+    consultation_duration_minutes = models.PositiveSmallIntegerField(null=True, blank=True)
     
     estimated_time = models.IntegerField(help_text="Estimated wait time in minutes", default=0)
 
     class Meta:
         db_table = 'patient_queues'
-        unique_together = ['queue', 'patient']
         ordering = ['position']
+        constraints = [
+            # Check-in relies on this to reject a repeat scan with an IntegrityError
+            models.UniqueConstraint(fields=['queue', 'patient'], name='uniq_queue_patient'),
+        ]
+        indexes = [
+            # Next waiting patient: filter(status='WAITING').order_by('position')
+            models.Index(fields=['queue', 'status', 'position'], name='pq_queue_status_pos_idx'),
+            # Whole-queue listings ordered by position
+            models.Index(fields=['queue', 'position'], name='pq_queue_pos_idx'),
+        ]
 
     def __str__(self):
         return f"{self.patient} in {self.queue} at position {self.position}"
 
     def save(self, *args, **kwargs):
         if not self.pk:  # If creating new entry
-            # Calculate position
-            last_position = PatientQueue.objects.filter(queue=self.queue).aggregate(models.Max('position'))['position__max']
-            self.position = (last_position or 0) + 1
-            
-            # Calculate estimated time
-            self.estimated_time = self.queue.get_estimated_wait_time(self.position)
+            with transaction.atomic():
+                # Claim a position with an atomic increment so concurrent
+                # check-ins can never be handed the same position
+                Queue.objects.filter(pk=self.queue_id).update(next_position=models.F('next_position') + 1)
+                self.position = Queue.objects.values_list('next_position', flat=True).get(pk=self.queue_id)
+                self.queue.next_position = self.position
+                
+                # Calculate estimated time
+                self.estimated_time = self.queue.get_estimated_wait_time(self.position)
+                
+                super().save(*args, **kwargs)
             
+            # Keep an already counted queue size in step with this insert
+            if 'size' in self.queue.__dict__:
+                self.queue.size += 1
+            return
+        
         super().save(*args, **kwargs)
     
     def update_status(self, new_status=None):
@@ -203,6 +296,9 @@ class PatientQueue(models.Model):
         """
         Calculate consultation duration in minutes.
         """
+        if self.consultation_duration_minutes is not None:
+            return self.consultation_duration_minutes
+        
         if self.consultation_start_time and self.consultation_end_time:
             delta = self.consultation_end_time - self.consultation_start_time
             return int(delta.total_seconds() / 60)
@@ -212,22 +308,21 @@ class PatientQueue(models.Model):
         """
         Mark this patient as emergency and move to front of queue.
         """
-        self.is_emergency = True
-        self.status = 'EMERGENCY'
-        self.save()
-        
-        # Move to front (position 1) and shift others
-        other_patients = PatientQueue.objects.filter(
+        # Shift everyone ahead back by one in a single statement
+        PatientQueue.objects.filter(
             queue=self.queue,
             position__lt=self.position
-        ).order_by('position')
-        
-        for patient_q in other_patients:
-            patient_q.position += 1
-            patient_q.save()
+        ).exclude(pk=self.pk).update(
+            position=models.F('position') + 1,
+            estimated_time=(models.F('position') + 1) * Queue.MINUTES_PER_PATIENT
+        )
         
+        # Move to front (position 1)
         self.position = 1
-        self.save()
+        self.estimated_time = self.queue.get_estimated_wait_time(1)
+        self.is_emergency = True
+        self.status = 'EMERGENCY'
+        self.save(update_fields=['position', 'estimated_time', 'is_emergency', 'status'])
     
     def update_position(self, new_position):
         """
@@ -236,7 +331,7 @@ class PatientQueue(models.Model):
         old_position = self.position
         self.position = new_position
         self.estimated_time = self.queue.get_estimated_wait_time(new_position)
-        self.save()
+        self.save(update_fields=['position', 'estimated_time'])
         
         # Adjust other patients' positions
         if new_position < old_position:
@@ -245,11 +340,17 @@ class PatientQueue(models.Model):
                 queue=self.queue,
                 position__gte=new_position,
                 position__lt=old_position
-            ).exclude(pk=self.pk).update(position=models.F('position') + 1)
+            ).exclude(pk=self.pk).update(
+                position=models.F('position') + 1,
+                estimated_time=(models.F('position') + 1) * Queue.MINUTES_PER_PATIENT
+            )
         elif new_position > old_position:
             # Moving down - shift others up
             PatientQueue.objects.filter(
                 queue=self.queue,
                 position__gt=old_position,
                 position__lte=new_position
-            ).exclude(pk=self.pk).update(position=models.F('position') - 1)
+            ).exclude(pk=self.pk).update(
+                position=models.F('position') - 1,
+                estimated_time=(models.F('position') - 1) * Queue.MINUTES_PER_PATIENT
+            )
@@ -2,17 +2,31 @@
 Service layer for Queue Check-in business logic.
 Handles QR code parsing, appointment verification, and check-in processing.
 """
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count
 from django.utils import timezone
-from django.core.exceptions import ValidationError
-from datetime import datetime
+import datetime
+from functools import partial
 from appointments.models import Appointment
-from patients.models import Patient
 from doctors.models import Doctor
 from .models import Queue, PatientQueue
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# QUEUE-<doctor_id>-YYYYMMDD, anchored at both ends; ASCII so \d rejects other digit scripts
+_QR_RE = re.compile(r'^QUEUE-(\d+)-(\d{8})\Z', re.ASCII)
+# Room for a long doctor id plus scanner whitespace; real payloads are about 20 characters
+QR_CODE_MAX_LENGTH = 32
+
+# Also bounds how stale other workers' copies can get, as invalidation is per-process
+DOCTOR_CHECKED_IN_CACHE_TIMEOUT = 10
+
+# Dates shown in check-in messages, e.g. "March 15, 2025"
+DISPLAY_DATE_FORMAT = '%B %d, %Y'
+
 
 class CheckInService:
     """Service class for handling patient and doctor check-ins via QR code"""
@@ -21,150 +35,128 @@ class CheckInService:
     def parse_qr_code(qr_data):
         """
         Parse QR code data to extract doctor_id and date.
+        Cheap length and prefix checks run first, so the anchored pattern
+        only ever sees plausible payloads.
         """
+        # Bound the raw input before stripping or logging it
+        if not qr_data or len(qr_data) > QR_CODE_MAX_LENGTH:
+            logger.error("Invalid QR code length: %s", len(qr_data) if qr_data else 0)
+            return None, None
+        
+        qr_data = qr_data.strip()
+        
+        # Shortest valid payload is QUEUE-<1 digit>-YYYYMMDD (16 characters)
+        match = None
+        if len(qr_data) >= 16 and qr_data.startswith('QUEUE-'):
+            match = _QR_RE.match(qr_data)
+        
+        if match is None:
+            logger.error(f"Invalid QR code format: {qr_data}")
+            return None, None
+        
+        doctor_part, date_part = match.groups()
         try:
-            parts = qr_data.strip().split('-')
-            
-            if len(parts) != 3 or parts[0] != 'QUEUE':
-                logger.error(f"Invalid QR code format: {qr_data}")
-                return None, None
-            
-            doctor_id = int(parts[1])
-            date_str = parts[2]
-            
-            # Parse date from YYYYMMDD format
-            date = datetime.strptime(date_str, '%Y%m%d').date()
-            
-            return doctor_id, date
-            
-        except (ValueError, IndexError) as e:
+            qr_date = datetime.date(int(date_part[:4]), int(date_part[4:6]), int(date_part[6:]))
+        except ValueError as e:
             logger.error(f"Error parsing QR code '{qr_data}': {e}")
             return None, None
+        
+        return int(doctor_part), qr_date
     
     @staticmethod
     def verify_patient_appointment(patient, doctor, date):
         """
         Verify that the patient has a scheduled appointment with the doctor on the given date.
+        The row is locked until check-in finishes, so call this inside a transaction.
         """
-        try:
-            appointment = Appointment.objects.get(
-                patient=patient,
-                doctor=doctor,
-                appointment_date=date,
-                status='SCHEDULED'
-            )
-            return appointment
-        except Appointment.DoesNotExist:
+        appointment = Appointment.objects.select_for_update().only('id', 'status').filter(
+            patient=patient,
+            doctor=doctor,
+            appointment_date=date,
+            status='SCHEDULED'
+        ).order_by('start_time').first()
+        
+        if appointment is None:
             logger.warning(f"No scheduled appointment found for patient {patient.pk} with doctor {doctor.pk} on {date}")
-            return None
-        except Appointment.MultipleObjectsReturned:
-            logger.error(f"Multiple appointments found for patient {patient.pk} with doctor {doctor.pk} on {date}")
-            return Appointment.objects.filter(
-                patient=patient,
-                doctor=doctor,
-                appointment_date=date,
-                status='SCHEDULED'
-            ).first()
+        return appointment
     
     @staticmethod
-    def verify_doctor_consultation(doctor, date):
-        """
-        Verify that the doctor has scheduled consultations (appointments) on the given date.
-        """
-        try:
-            appointment = Appointment.objects.get(
-                patient=patient,
-                doctor=doctor,
-                appointment_date=date,
-                status='SCHEDULED'
-            )
-            return appointment
-            
-        except Appointment.DoesNotExist:
-            logger.warning(f"No scheduled appointment found for patient {patient.pk} with doctor {doctor.pk} on {date}")
-            return None
-        except Appointment.MultipleObjectsReturned:
-            # Should not happen due to unique_together constraint, but handle it
-            logger.error(f"Multiple appointments found for patient {patient.pk} with doctor {doctor.pk} on {date}")
-            return Appointment.objects.filter(
-                patient=patient,
-                doctor=doctor,
-                appointment_date=date,
-                status='SCHEDULED'
-            ).first()
+    def _doctor_checked_in_key(doctor_id, date):
+        return f'queues:doctor_checked_in:{doctor_id}:{date.isoformat()}'
     
     @staticmethod
-    def verify_doctor_consultation(doctor, date):
+    def is_doctor_checked_in(doctor_id, date):
         """
-        Verify that the doctor has scheduled consultations (appointments) on the given date.    
+        Whether any of the doctor's appointments on the date has moved past SCHEDULED.
+        Polled by every waiting patient's status page, so the answer is cached briefly.
+        Check-ins drop the entry, but the default cache is per-process, so other workers
+        may serve the old answer until DOCTOR_CHECKED_IN_CACHE_TIMEOUT expires it.
         """
-        has_consultations = Appointment.objects.filter(
-            doctor=doctor,
-            appointment_date=date,
-            status='SCHEDULED'
-        ).exists()
-        
-        if not has_consultations:
-            logger.warning(f"Doctor {doctor.pk} has no consultations scheduled for {date}")
-        
-        return has_consultations
+        key = CheckInService._doctor_checked_in_key(doctor_id, date)
+        checked_in = cache.get(key)
+        if checked_in is None:
+            checked_in = Appointment.objects.filter(
+                doctor_id=doctor_id,
+                appointment_date=date,
+                status__in=['CHECKED_IN', 'IN_PROGRESS', 'COMPLETED']
+            ).exists()
+            cache.set(key, checked_in, DOCTOR_CHECKED_IN_CACHE_TIMEOUT)
+        return checked_in
     
     @staticmethod
     def check_in_patient(patient, queue, appointment):
         """
         Check in a patient by adding them to the queue.
+        The (queue, patient) uniqueness constraint rejects repeat check-ins.
         """
         try:
-            # Check if patient is already in the queue
-            existing_entry = PatientQueue.objects.filter(
-                queue=queue,
-                patient=patient
-            ).first()
-            
-            if existing_entry:
-                return False, "You are already checked in for this appointment.", None
-            
-            # Create patient queue entry
-            patient_queue = PatientQueue.objects.create(
-                queue=queue,
-                patient=patient,
-                status='WAITING',
-                checkedin_via_qrcode=True
-            )
-            
-            # Update appointment status to CHECKED_IN
-            appointment.status = 'CHECKED_IN'
-            appointment.save()
-            
-            logger.info(f"Patient {patient.pk} checked in to queue {queue.pk} at position {patient_queue.position}")
-            
-            return True, f"Successfully checked in! Your position in queue: {patient_queue.position}", patient_queue
-            
+            with transaction.atomic():
+                patient_queue = PatientQueue.objects.create(
+                    queue=queue,
+                    patient=patient,
+                    status='WAITING',
+                    checkedin_via_qrcode=True
+                )
+                
+                # Status-only change; skip the model save() and its full_clean()
+                now = timezone.now()
+                Appointment.objects.filter(pk=appointment.pk).update(status='CHECKED_IN', updated_at=now)
+                appointment.status = 'CHECKED_IN'
+                appointment.updated_at = now
+                # Clear after commit, or a poll landing first would re-cache the old answer
+                transaction.on_commit(partial(
+                    cache.delete,
+                    CheckInService._doctor_checked_in_key(queue.doctor_id, queue.date)
+                ))
+        except IntegrityError:
+            return False, "You are already checked in for this appointment.", None
         except Exception as e:
             logger.error(f"Error checking in patient {patient.pk}: {e}")
             return False, "An error occurred during check-in. Please contact reception.", None
+        
+        logger.info(f"Patient {patient.pk} checked in to queue {queue.pk} at position {patient_queue.position}")
+        
+        return True, f"Successfully checked in! Your position in queue: {patient_queue.position}", patient_queue
     
     @staticmethod
     def check_in_doctor(doctor, queue, date):
         """
         Check in a doctor by updating all their appointments for the day to CHECKED_IN.
+        The UPDATE's row count doubles as the check for scheduled consultations.
+        Booking caps a doctor at 15 appointments a day, so this stays a small,
+        index-bounded UPDATE and is safe to run inside the request.
         """
         try:
-            # Get all scheduled appointments for the doctor on this date
-            appointments = Appointment.objects.filter(
+            appointments_count = Appointment.objects.filter(
                 doctor=doctor,
                 appointment_date=date,
                 status='SCHEDULED'
-            )
-            
-            appointments_count = appointments.count()
+            ).update(status='CHECKED_IN')
             
             if appointments_count == 0:
-                return False, "No scheduled consultations found for today.", 0
-            
-            # Update all appointments to CHECKED_IN status
-            appointments.update(status='CHECKED_IN')
+                return False, f"No consultations scheduled for {date.strftime(DISPLAY_DATE_FORMAT)}.", 0
             
+            cache.delete(CheckInService._doctor_checked_in_key(doctor.pk, date))
             logger.info(f"Doctor {doctor.pk} checked in for {appointments_count} consultations on {date}")
             
             return True, f"Successfully checked in! You have {appointments_count} consultations today.", appointments_count
@@ -173,6 +165,125 @@ class CheckInService:
             logger.error(f"Error checking in doctor {doctor.pk}: {e}")
             return False, "An error occurred during check-in. Please contact reception.", 0
     
+    @staticmethod
+    def get_check_in_queue(doctor_id, date):
+        """
+        Get the doctor's queue for the date, creating it on the first scan of the day.
+        Returns None if the doctor does not exist.
+        """
+        # The queue normally exists already, so fetch it together with its doctor.
+        # The annotated size is kept current by enqueueing, so reading it later costs no query.
+        try:
+            return Queue.objects.select_related('doctor__user').annotate(
+                size=Count('patient_queues')
+            ).get(doctor_id=doctor_id, date=date)
+        except Queue.DoesNotExist:
+            pass
+        
+        try:
+            doctor = Doctor.objects.select_related('user').get(pk=doctor_id)
+        except Doctor.DoesNotExist:
+            return None
+        
+        queue, created = Queue.objects.get_or_create(
+            doctor=doctor,
+            date=date
+        )
+        if created:
+            queue.size = 0
+        return queue
+    
+    @staticmethod
+    def process_batch_check_in(items):
+        """
+        Check in several patients at once, e.g. a group at reception.
+        Each item is a dict with 'qr_data' and 'patient_id'. Appointments for the whole
+        batch are looked up and updated with one query each, and every queue gets a
+        single bulk insert. Returns one result dict per item, in input order.
+        """
+        results = [{'success': False, 'message': '', 'position': None} for _ in items]
+        
+        # Parse and group the items by (doctor, date)
+        groups = {}
+        for index, item in enumerate(items):
+            qr_data = item.get('qr_data')
+            doctor_id, date = CheckInService.parse_qr_code(qr_data) if isinstance(qr_data, str) else (None, None)
+            patient_id = item.get('patient_id')
+            if not doctor_id or not date:
+                results[index]['message'] = 'Invalid QR code format.'
+            elif not isinstance(patient_id, int) or isinstance(patient_id, bool) or not 0 < patient_id < 2 ** 63:
+                results[index]['message'] = 'Invalid patient.'
+            else:
+                groups.setdefault((doctor_id, date), []).append((index, patient_id))
+        
+        if not groups:
+            return results
+        
+        queues = {}
+        for (doctor_id, date), members in groups.items():
+            queue = CheckInService.get_check_in_queue(doctor_id, date)
+            if queue is None:
+                for index, patient_id in members:
+                    results[index]['message'] = 'Invalid QR code: Doctor not found.'
+            else:
+                queues[(doctor_id, date)] = queue
+        
+        patient_ids = {patient_id for key in queues for _, patient_id in groups[key]}
+        
+        with transaction.atomic():
+            # One query for every scheduled appointment the batch could match
+            appointments = {}
+            for appointment in Appointment.objects.select_for_update().filter(
+                patient_id__in=patient_ids,
+                doctor_id__in={doctor_id for doctor_id, _ in queues},
+                appointment_date__in={date for _, date in queues},
+                status='SCHEDULED'
+            ).order_by('-start_time').values('pk', 'patient_id', 'doctor_id', 'appointment_date'):
+                # Ordered latest first, so the earliest appointment of the day wins
+                key = (appointment['patient_id'], appointment['doctor_id'], appointment['appointment_date'])
+                appointments[key] = appointment['pk']
+            
+            already_queued = set(PatientQueue.objects.filter(
+                queue__in=queues.values(),
+                patient_id__in=patient_ids
+            ).values_list('queue_id', 'patient_id'))
+            
+            appointment_ids = []
+            for (doctor_id, date), queue in queues.items():
+                admitted = []
+                for index, patient_id in groups[(doctor_id, date)]:
+                    appointment_id = appointments.get((patient_id, doctor_id, date))
+                    if (queue.pk, patient_id) in already_queued:
+                        results[index]['message'] = 'Patient is already checked in.'
+                    elif appointment_id is None:
+                        results[index]['message'] = (
+                            f'No scheduled appointment found with {queue.doctor} '
+                            f'on {date.strftime(DISPLAY_DATE_FORMAT)}.'
+                        )
+                    else:
+                        already_queued.add((queue.pk, patient_id))
+                        appointment_ids.append(appointment_id)
+                        admitted.append((index, patient_id))
+                
+                entries = queue.enqueue_many([patient_id for _, patient_id in admitted], via_qrcode=True)
+                for (index, _), entry in zip(admitted, entries):
+                    results[index].update(
+                        success=True,
+                        message=f'Checked in at position {entry.position}.',
+                        position=entry.position
+                    )
+            
+            Appointment.objects.filter(pk__in=appointment_ids).update(
+                status='CHECKED_IN',
+                updated_at=timezone.now()
+            )
+        
+        for doctor_id, date in queues:
+            cache.delete(CheckInService._doctor_checked_in_key(doctor_id, date))
+        
+        logger.info(f"Batch check-in admitted {len(appointment_ids)} of {len(items)} patients")
+        return results
+    
     @staticmethod
     def process_check_in(user, qr_data):
         """
@@ -189,34 +300,40 @@ class CheckInService:
                 'data': None
             }
         
-        # Get the queue
-        try:
-            doctor = Doctor.objects.get(pk=doctor_id)
-            queue, created = Queue.objects.get_or_create(
-                doctor=doctor,
-                date=date
-            )
-        except Doctor.DoesNotExist:
+        queue = CheckInService.get_check_in_queue(doctor_id, date)
+        if queue is None:
             return {
                 'success': False,
                 'message': 'Invalid QR code: Doctor not found.',
                 'data': None
             }
+        doctor = queue.doctor
         
         # Check user role and process accordingly
         if user.is_patient():
             # Patient check-in
             patient = user.patient_profile
-            appointment = CheckInService.verify_patient_appointment(patient, doctor, date)
-            
-            if not appointment:
-                return {
-                    'success': False,
-                    'message': f'No scheduled appointment found with {doctor} on {date.strftime("%B %d, %Y")}.',
-                    'data': None
-                }
             
-            success, message, patient_queue = CheckInService.check_in_patient(patient, queue, appointment)
+            # Lock the appointment for the whole check-in; a second scan waits here, then
+            # finds it no longer SCHEDULED and is told it is already queued
+            with transaction.atomic():
+                appointment = CheckInService.verify_patient_appointment(patient, doctor, date)
+                
+                if not appointment and PatientQueue.objects.filter(queue=queue, patient=patient).exists():
+                    return {
+                        'success': False,
+                        'message': 'You are already checked in for this appointment.',
+                        'data': None
+                    }
+                
+                if not appointment:
+                    return {
+                        'success': False,
+                        'message': f'No scheduled appointment found with {doctor} on {date.strftime(DISPLAY_DATE_FORMAT)}.',
+                        'data': None
+                    }
+                
+                success, message, patient_queue = CheckInService.check_in_patient(patient, queue, appointment)
             
             return {
                 'success': success,
@@ -240,17 +357,15 @@ class CheckInService:
                     'data': None
                 }
             
-            has_consultations = CheckInService.verify_doctor_consultation(doctor_profile, date)
+            success, message, count = CheckInService.check_in_doctor(doctor_profile, queue, date)
             
-            if not has_consultations:
+            if not success:
                 return {
                     'success': False,
-                    'message': f'No consultations scheduled for {date.strftime("%B %d, %Y")}.',
+                    'message': message,
                     'data': None
                 }
             
-            success, message, count = CheckInService.check_in_doctor(doctor_profile, queue, date)
-            
             return {
                 'success': success,
                 'message': message,
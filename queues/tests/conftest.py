@@ -0,0 +1,76 @@
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.utils import timezone
+from accounts.models import User
+from patients.models import Patient
+from doctors.models import Doctor
+from appointments.models import Appointment
+from queues.models import Queue
+from datetime import time
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Write generated QR images under a per-test directory instead of the repo's media/"""
+    settings.MEDIA_ROOT = tmp_path
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+@pytest.fixture
+def client():
+    return Client()
+
+@pytest.fixture
+def doctor_user(db):
+    user = User.objects.create_user(
+        email='doctor@example.com',
+        password='password123',
+        first_name='Jane',
+        last_name='Smith',
+        date_of_birth='1980-01-01',
+        role='DOCTOR',
+        phone='0921234567'
+    )
+    return user
+
+@pytest.fixture
+def doctor(doctor_user):
+    return Doctor.objects.create(
+        user=doctor_user,
+        specialization='CARDIOLOGY',
+        license_number='LIC12345'
+    )
+
+@pytest.fixture
+def make_patient(db):
+    def _make_patient(index):
+        user = User.objects.create_user(
+            email=f'patient{index}@example.com',
+            password='password123',
+            first_name='Patient',
+            last_name=str(index),
+            date_of_birth='1990-01-01',
+            role='PATIENT',
+            phone='0911234567'
+        )
+        return Patient.objects.create(user=user)
+    return _make_patient
+
+@pytest.fixture
+def queue(doctor):
+    return Queue.objects.create(doctor=doctor, date=timezone.now().date())
+
+@pytest.fixture
+def make_appointment(doctor):
+    def _make_appointment(patient, hour=9):
+        return Appointment.objects.create(
+            patient=patient,
+            doctor=doctor,
+            appointment_date=timezone.now().date(),
+            start_time=time(hour, 0),
+            end_time=time(hour, 30),
+            status='SCHEDULED'
+        )
+    return _make_appointment
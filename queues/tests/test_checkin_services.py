@@ -0,0 +1,161 @@
+import pytest
+from datetime import date
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from queues.services import CheckInService
+
+
+class TestParseQRCode:
+    
+    def test_parse_valid_code(self):
+        """Test a well formed payload yields the doctor id and date"""
+        assert CheckInService.parse_qr_code('QUEUE-42-20250315') == (42, date(2025, 3, 15))
+    
+    def test_parse_strips_whitespace(self):
+        """Test surrounding whitespace from the scanner is ignored"""
+        assert CheckInService.parse_qr_code(' QUEUE-7-20250101\n') == (7, date(2025, 1, 1))
+    
+    @pytest.mark.parametrize('qr_data', [
+        None,
+        '',
+        'QUEUE-1-2025011',
+        'QUEUE--20250101',
+        'QUEUE-1-2025-0101',
+        'QUEUE-x-20250101',
+        'QUEUE-²-20250101',
+        'QUEUE-1-20251301',
+        'QUEUE-1-20250230',
+        'TICKET-1-20250101',
+        'QUEUE-1-20250101-9',
+        'QUEUE-' + '1' * 100 + '-20250101',
+        'QUEUE-1-20250101' + ' ' * 100,
+    ])
+    def test_parse_rejects_invalid_codes(self, qr_data):
+        """Test malformed payloads and impossible dates are rejected"""
+        assert CheckInService.parse_qr_code(qr_data) == (None, None)
+
+
+@pytest.mark.django_db
+class TestCheckInPatient:
+    
+    def test_check_in_adds_patient_to_queue(self, queue, make_patient, make_appointment):
+        """Test a check-in queues the patient and marks the appointment"""
+        patient = make_patient(1)
+        appointment = make_appointment(patient)
+        created_updated_at = appointment.updated_at
+        
+        success, message, entry = CheckInService.check_in_patient(patient, queue, appointment)
+        
+        assert success
+        assert entry.position == 1
+        assert entry.checkedin_via_qrcode
+        appointment.refresh_from_db()
+        assert appointment.status == 'CHECKED_IN'
+        assert appointment.updated_at > created_updated_at
+
+    def test_repeat_check_in_rejected(self, queue, make_patient, make_appointment):
+        """Test a second check-in is refused without using up a position"""
+        patient = make_patient(1)
+        appointment = make_appointment(patient)
+        CheckInService.check_in_patient(patient, queue, appointment)
+        
+        success, message, entry = CheckInService.check_in_patient(patient, queue, appointment)
+        
+        assert not success
+        assert entry is None
+        assert 'already checked in' in message
+        queue.refresh_from_db()
+        assert queue.next_position == 1
+
+
+@pytest.mark.django_db
+class TestProcessCheckIn:
+    
+    def test_patient_check_in(self, queue, make_patient, make_appointment):
+        """Test a patient scan checks in against their scheduled appointment"""
+        patient = make_patient(1)
+        appointment = make_appointment(patient)
+        
+        result = CheckInService.process_check_in(patient.user, queue.qrcode)
+        
+        assert result['success']
+        assert result['data']['position'] == 1
+        assert result['data']['queue_size'] == 1
+        appointment.refresh_from_db()
+        assert appointment.status == 'CHECKED_IN'
+
+    def test_checked_in_cache_cleared_after_commit(self, queue, doctor, make_patient, make_appointment, django_capture_on_commit_callbacks):
+        """Test the doctor-checked-in answer is only dropped once the check-in commits"""
+        patient = make_patient(1)
+        make_appointment(patient)
+        assert not CheckInService.is_doctor_checked_in(doctor.pk, queue.date)
+        
+        with django_capture_on_commit_callbacks() as callbacks:
+            CheckInService.process_check_in(patient.user, queue.qrcode)
+            assert not CheckInService.is_doctor_checked_in(doctor.pk, queue.date)
+        
+        for callback in callbacks:
+            callback()
+        assert CheckInService.is_doctor_checked_in(doctor.pk, queue.date)
+
+    def test_patient_check_in_reports_size_without_counting(self, queue, make_patient, make_appointment):
+        """Test the reported queue size comes from the lookup, not a separate COUNT"""
+        queue.enqueue(make_patient(0))
+        patient = make_patient(1)
+        make_appointment(patient)
+        
+        with CaptureQueriesContext(connection) as context:
+            result = CheckInService.process_check_in(patient.user, queue.qrcode)
+        
+        assert result['data']['queue_size'] == 2
+        counts = [q for q in context.captured_queries if 'COUNT(' in q['sql'].upper()]
+        assert len(counts) == 1
+
+    def test_repeat_scan_reports_already_checked_in(self, queue, make_patient, make_appointment):
+        """Test scanning again after checking in says so rather than reporting no appointment"""
+        patient = make_patient(1)
+        make_appointment(patient)
+        CheckInService.process_check_in(patient.user, queue.qrcode)
+        
+        result = CheckInService.process_check_in(patient.user, queue.qrcode)
+        
+        assert not result['success']
+        assert result['message'] == 'You are already checked in for this appointment.'
+        assert queue.patient_queues.count() == 1
+
+    def test_patient_without_appointment(self, queue, make_patient):
+        """Test a patient scan without a scheduled appointment is refused"""
+        patient = make_patient(1)
+        
+        result = CheckInService.process_check_in(patient.user, queue.qrcode)
+        
+        assert not result['success']
+        assert 'No scheduled appointment' in result['message']
+        assert queue.is_empty()
+
+    def test_unknown_doctor(self, make_patient):
+        """Test a scan for a doctor that does not exist is refused"""
+        patient = make_patient(1)
+        
+        result = CheckInService.process_check_in(patient.user, 'QUEUE-999999-20250101')
+        
+        assert not result['success']
+        assert 'Doctor not found' in result['message']
+
+    def test_doctor_check_in(self, queue, doctor, make_patient, make_appointment):
+        """Test a doctor scan checks in all of today's scheduled consultations"""
+        make_appointment(make_patient(1), hour=9)
+        make_appointment(make_patient(2), hour=10)
+        
+        result = CheckInService.process_check_in(doctor.user, queue.qrcode)
+        
+        assert result['success']
+        assert result['data']['consultations_count'] == 2
+        assert not doctor.appointments.filter(status='SCHEDULED').exists()
+
+    def test_doctor_without_consultations(self, queue, doctor):
+        """Test a doctor scan with nothing scheduled is refused"""
+        result = CheckInService.process_check_in(doctor.user, queue.qrcode)
+        
+        assert not result['success']
+        assert 'No consultations scheduled' in result['message']
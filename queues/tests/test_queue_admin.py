@@ -0,0 +1,44 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.models import User
+
+
+@pytest.fixture
+def admin_client(client, db):
+    user = User.objects.create_superuser(
+        email='admin@example.com',
+        password='password123',
+        first_name='Ada',
+        last_name='Admin',
+        date_of_birth='1975-01-01'
+    )
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+class TestQueueAdmin:
+    
+    def test_changelist_links_qrcode_image(self, admin_client, queue):
+        """Test the queue list links each QR code to its image"""
+        response = admin_client.get(reverse('admin:queues_queue_changelist'))
+        
+        assert response.status_code == 200
+        assert queue.qrcode_url
+        assert f'href="{queue.qrcode_url}"' in response.content.decode()
+
+    def test_patient_queue_changelist_query_count(self, admin_client, queue, make_patient):
+        """Test the patient queue list does not query per row"""
+        url = reverse('admin:queues_patientqueue_changelist')
+        queue.enqueue(make_patient(1))
+        with CaptureQueriesContext(connection) as baseline:
+            admin_client.get(url)
+        
+        queue.enqueue_many([make_patient(i).pk for i in range(2, 6)])
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        
+        assert response.status_code == 200
+        assert len(context.captured_queries) == len(baseline.captured_queries)
@@ -0,0 +1,150 @@
+import pytest
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from queues.models import Queue, PatientQueue
+
+
+@pytest.mark.django_db
+class TestQueuePositions:
+    
+    def test_enqueue_assigns_sequential_positions(self, queue, make_patient):
+        """Test that each new entry gets the next position in the queue"""
+        entries = [queue.enqueue(make_patient(i)) for i in range(3)]
+        
+        assert [entry.position for entry in entries] == [1, 2, 3]
+        assert [entry.estimated_time for entry in entries] == [30, 60, 90]
+        queue.refresh_from_db()
+        assert queue.next_position == 3
+
+    def test_positions_are_not_reused_after_removal(self, queue, make_patient):
+        """Test that removing the last entry does not hand its position out again"""
+        queue.enqueue(make_patient(1))
+        last = queue.enqueue(make_patient(2))
+        last.delete()
+        
+        entry = queue.enqueue(make_patient(3))
+        
+        assert entry.position == 3
+        assert PatientQueue.objects.filter(queue=queue, position=3).count() == 1
+
+    def test_mark_as_emergency_moves_entry_to_front(self, queue, make_patient):
+        """Test that an emergency jumps the queue and the others shift back"""
+        first, second, third = [queue.enqueue(make_patient(i)) for i in range(3)]
+        
+        third.mark_as_emergency()
+        
+        positions = dict(PatientQueue.objects.filter(queue=queue).values_list('pk', 'position'))
+        assert positions == {third.pk: 1, first.pk: 2, second.pk: 3}
+        third.refresh_from_db()
+        assert third.is_emergency
+        assert third.status == 'EMERGENCY'
+
+    def test_update_position_keeps_estimates_in_step(self, queue, make_patient):
+        """Test that moving an entry recomputes the wait estimate of every shifted entry"""
+        first, second, third = [queue.enqueue(make_patient(i)) for i in range(3)]
+        
+        first.update_position(3)
+        
+        rows = PatientQueue.objects.filter(queue=queue).values_list('pk', 'position', 'estimated_time')
+        assert {pk: (position, estimate) for pk, position, estimate in rows} == {
+            second.pk: (1, 30),
+            third.pk: (2, 60),
+            first.pk: (3, 90),
+        }
+
+
+@pytest.mark.django_db
+class TestQueueSize:
+    
+    def test_size_is_counted_once(self, queue, make_patient, django_assert_num_queries):
+        """Test that repeated size checks reuse the first count"""
+        queue.enqueue(make_patient(1))
+        
+        with django_assert_num_queries(1):
+            assert queue.get_size() == 1
+            assert not queue.is_empty()
+            assert queue.get_size() == 1
+
+    def test_is_empty_without_counting(self, queue, make_patient):
+        """Test that is_empty checks for a row instead of counting them"""
+        assert queue.is_empty()
+        queue.enqueue(make_patient(1))
+        
+        assert not queue.is_empty()
+        assert 'size' not in queue.__dict__
+
+    def test_size_tracks_new_entries(self, queue, make_patient):
+        """Test that enqueueing through a counted queue keeps its size current"""
+        assert queue.get_size() == 0
+        
+        queue.enqueue(make_patient(1))
+        
+        assert queue.get_size() == 1
+
+    def test_size_from_annotation(self, queue, make_patient, django_assert_num_queries):
+        """Test that an annotated queryset prefills the size"""
+        queue.enqueue(make_patient(1))
+        annotated = Queue.objects.annotate(size=Count('patient_queues')).get(pk=queue.pk)
+        
+        with django_assert_num_queries(0):
+            assert annotated.get_size() == 1
+
+
+@pytest.mark.django_db
+class TestDequeue:
+    
+    def test_dequeue_takes_head_of_queue(self, queue, make_patient):
+        """Test dequeue starts the first waiting patient's consultation"""
+        first = queue.enqueue(make_patient(1))
+        queue.enqueue(make_patient(2))
+        
+        entry = queue.dequeue()
+        
+        assert entry.pk == first.pk
+        assert entry.status == 'IN_PROGRESS'
+        assert entry.consultation_start_time is not None
+        assert queue.patient_queues.filter(status='WAITING').count() == 1
+
+    def test_dequeue_empty_queue(self, queue):
+        """Test dequeue returns None when nobody is waiting"""
+        assert queue.dequeue() is None
+
+
+@pytest.mark.django_db
+class TestEnqueueMany:
+    
+    def test_enqueue_many_continues_positions(self, queue, make_patient):
+        """Test that a batch takes the next block of positions in one insert"""
+        queue.enqueue(make_patient(0))
+        patients = [make_patient(i) for i in range(1, 4)]
+        
+        with CaptureQueriesContext(connection) as context:
+            entries = queue.enqueue_many([p.pk for p in patients])
+        
+        inserts = [q for q in context.captured_queries if q['sql'].startswith('INSERT')]
+        assert len(inserts) == 1
+        
+        assert [entry.position for entry in entries] == [2, 3, 4]
+        assert [entry.estimated_time for entry in entries] == [60, 90, 120]
+        assert queue.get_size() == 4
+        
+        entry = queue.enqueue(make_patient(5))
+        assert entry.position == 5
+
+    def test_enqueue_many_empty(self, queue, django_assert_num_queries):
+        """Test that an empty batch does not touch the database"""
+        with django_assert_num_queries(0):
+            assert queue.enqueue_many([]) == []
+
+
+@pytest.mark.django_db
+class TestQueueQRCode:
+    
+    def test_qrcode_rendered_as_svg(self, queue):
+        """Test that a new queue stores its QR code as an SVG file"""
+        assert queue.qrcode == f"QUEUE-{queue.doctor.pk}-{queue.date.strftime('%Y%m%d')}"
+        assert queue.qrcode_image.name.endswith('.svg')
+        
+        with queue.qrcode_image.open('rb') as image:
+            assert b'<svg' in image.read()
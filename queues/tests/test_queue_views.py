@@ -0,0 +1,226 @@
+import json
+import pytest
+from django.urls import reverse
+from accounts.models import User
+from queues.services import CheckInService
+
+
+@pytest.mark.django_db
+class TestPatientQueueStatusView:
+    
+    def test_people_ahead_counts_waiting_only(self, client, queue, make_patient):
+        """Test the status page counts only waiting patients ahead of the viewer"""
+        entries = [queue.enqueue(make_patient(i)) for i in range(4)]
+        entries[0].status = 'IN_PROGRESS'
+        entries[0].save()
+        viewer = entries[3]
+        client.force_login(viewer.patient.user)
+        
+        response = client.get(reverse('queues:queue_status'))
+        
+        assert response.status_code == 200
+        assert response.context['queue_entry'].pk == viewer.pk
+        assert response.context['people_ahead'] == 2
+
+    def test_doctor_check_in_refreshes_status(self, client, queue, doctor, make_patient, make_appointment):
+        """Test the cached doctor status is dropped when the doctor checks in"""
+        make_appointment(make_patient(0), hour=11)
+        viewer = queue.enqueue(make_patient(1))
+        client.force_login(viewer.patient.user)
+        url = reverse('queues:queue_status')
+        
+        assert client.get(url).context['doctor_checked_in'] is False
+        
+        CheckInService.process_check_in(doctor.user, queue.qrcode)
+        
+        assert client.get(url).context['doctor_checked_in'] is True
+
+    def test_status_page_query_count(self, client, queue, make_patient, django_assert_max_num_queries):
+        """Test the status page loads the entry, queue and doctor together"""
+        viewer = queue.enqueue(make_patient(1))
+        client.force_login(viewer.patient.user)
+        url = reverse('queues:queue_status')
+        client.get(url)
+        
+        # Session, user with profile, queue entry with queue and doctor; doctor status is cached
+        with django_assert_max_num_queries(3):
+            response = client.get(url)
+        
+        assert 'Dr. Jane Smith' in response.content.decode()
+
+    def test_no_active_queue(self, client, make_patient):
+        """Test a patient who has not checked in sees no queue"""
+        client.force_login(make_patient(1).user)
+        
+        response = client.get(reverse('queues:queue_status'))
+        
+        assert response.context['has_active_queue'] is False
+
+
+@pytest.mark.django_db
+class TestProcessCheckInView:
+    
+    @pytest.mark.parametrize('body', [b'not json', b'\xff\xfe', b'[]', b'{"qr_data": 5}', b'{}'])
+    def test_malformed_payload_rejected(self, client, make_patient, body):
+        """Test malformed request bodies get a 400 instead of a server error"""
+        client.force_login(make_patient(1).user)
+        
+        response = client.post(reverse('queues:process_checkin'), body, content_type='application/json')
+        
+        assert response.status_code == 400
+        assert response.json()['success'] is False
+
+
+@pytest.mark.django_db
+class TestBatchCheckInView:
+    
+    @pytest.fixture
+    def nurse_client(self, client):
+        nurse_user = User.objects.create_user(
+            email='nurse@example.com',
+            password='password123',
+            first_name='Nina',
+            last_name='Nurse',
+            date_of_birth='1985-01-01',
+            role='NURSE',
+            phone='0931234567'
+        )
+        client.force_login(nurse_user)
+        return client
+    
+    def post(self, client, items):
+        return client.post(
+            reverse('queues:batch_checkin'),
+            json.dumps({'items': items}),
+            content_type='application/json'
+        )
+    
+    def test_batch_check_in(self, nurse_client, queue, make_patient, make_appointment):
+        """Test a batch admits scheduled patients and reports the rest per item"""
+        first, second, stranger = make_patient(1), make_patient(2), make_patient(3)
+        first_appointment = make_appointment(first, hour=9)
+        make_appointment(second, hour=10)
+        
+        response = self.post(nurse_client, [
+            {'qr_data': queue.qrcode, 'patient_id': first.pk},
+            {'qr_data': queue.qrcode, 'patient_id': stranger.pk},
+            {'qr_data': 'garbage', 'patient_id': second.pk},
+            {'qr_data': queue.qrcode, 'patient_id': second.pk},
+            {'qr_data': queue.qrcode, 'patient_id': first.pk},
+        ])
+        
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [result['success'] for result in results] == [True, False, False, True, False]
+        assert [result['position'] for result in results] == [1, None, None, 2, None]
+        assert 'already checked in' in results[4]['message']
+        
+        assert list(queue.patient_queues.values_list('patient_id', 'checkedin_via_qrcode')) == [
+            (first.pk, True),
+            (second.pk, True),
+        ]
+        first_appointment.refresh_from_db()
+        assert first_appointment.status == 'CHECKED_IN'
+
+    def test_batch_reports_invalid_items(self, nurse_client, queue, make_patient, make_appointment):
+        """Test wrongly typed or out-of-range fields fail only their own item"""
+        patient = make_patient(1)
+        appointment = make_appointment(patient, hour=9)
+        
+        response = self.post(nurse_client, [
+            {'qr_data': 5, 'patient_id': patient.pk},
+            {'qr_data': ['x'], 'patient_id': patient.pk},
+            {'qr_data': queue.qrcode, 'patient_id': 10 ** 30},
+            {'qr_data': queue.qrcode, 'patient_id': 0},
+            {'qr_data': queue.qrcode, 'patient_id': patient.pk},
+        ])
+        
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [result['success'] for result in results] == [False, False, False, False, True]
+        assert [result['message'] for result in results[:4]] == [
+            'Invalid QR code format.',
+            'Invalid QR code format.',
+            'Invalid patient.',
+            'Invalid patient.',
+        ]
+        before = appointment.updated_at
+        appointment.refresh_from_db()
+        assert appointment.status == 'CHECKED_IN'
+        assert appointment.updated_at > before
+
+    @pytest.mark.parametrize('body', [{}, {'items': []}, {'items': ['QUEUE-1-20250101']}])
+    def test_batch_rejects_malformed_body(self, nurse_client, body):
+        """Test a body without a list of item objects is refused"""
+        response = nurse_client.post(reverse('queues:batch_checkin'), json.dumps(body), content_type='application/json')
+        
+        assert response.status_code == 400
+
+    def test_batch_requires_reception_staff(self, client, make_patient):
+        """Test patients cannot use the batch endpoint"""
+        client.force_login(make_patient(1).user)
+        
+        response = self.post(client, [{'qr_data': 'QUEUE-1-20250101', 'patient_id': 1}])
+        
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestQRScannerView:
+    
+    def test_repeat_load_not_modified(self, client, make_patient):
+        """Test a repeat load in the same session is answered with 304"""
+        client.force_login(make_patient(1).user)
+        url = reverse('queues:qr_scanner')
+        
+        response = client.get(url)
+        assert response.status_code == 200
+        
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == 304
+
+    def test_etag_differs_per_user(self, client, make_patient):
+        """Test two users never share a cached scanner page"""
+        url = reverse('queues:qr_scanner')
+        client.force_login(make_patient(1).user)
+        first_etag = client.get(url)['ETag']
+        
+        client.force_login(make_patient(2).user)
+        response = client.get(url, HTTP_IF_NONE_MATCH=first_etag)
+        
+        assert response.status_code == 200
+        assert response['ETag'] != first_etag
+
+    def test_etag_changes_with_user_name(self, client, make_patient):
+        """Test renaming the user invalidates the cached page, which shows the name"""
+        user = make_patient(1).user
+        client.force_login(user)
+        url = reverse('queues:qr_scanner')
+        first_etag = client.get(url)['ETag']
+        
+        user.first_name = 'Renamed'
+        user.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=first_etag)
+        
+        assert response.status_code == 200
+        assert 'Renamed' in response.content.decode()
+
+    def test_etag_changes_with_template(self, client, make_patient, monkeypatch):
+        """Test a deploy that touches the page templates invalidates cached copies"""
+        client.force_login(make_patient(1).user)
+        url = reverse('queues:qr_scanner')
+        first_etag = client.get(url)['ETag']
+        
+        monkeypatch.setattr('queues.views._scanner_templates_version', lambda: 0.0)
+        response = client.get(url, HTTP_IF_NONE_MATCH=first_etag)
+        
+        assert response.status_code == 200
+        assert response['ETag'] != first_etag
+
+    def test_anonymous_redirected(self, client):
+        """Test anonymous users are still sent to login"""
+        response = client.get(reverse('queues:qr_scanner'))
+        
+        assert response.status_code == 302
+        assert not response.has_header('ETag')
+
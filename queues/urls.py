@@ -2,7 +2,7 @@
 URL configuration for queues app.
 """
 from django.urls import path
-from .views import QRScannerView, ProcessCheckInView, PatientQueueStatusView
+from .views import QRScannerView, ProcessCheckInView, BatchCheckInView, PatientQueueStatusView
 
 
 app_name = 'queues'
@@ -10,5 +10,6 @@ app_name = 'queues'
 urlpatterns = [
     path('scan/', QRScannerView.as_view(), name='qr_scanner'),
     path('checkin/', ProcessCheckInView.as_view(), name='process_checkin'),
+    path('checkin/batch/', BatchCheckInView.as_view(), name='batch_checkin'),
     path('status/', PatientQueueStatusView.as_view(), name='queue_status'),
 ]
\ No newline at end of file
@@ -1,20 +1,53 @@
 """
 Views for Queue Check-in functionality.
 """
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views.generic import TemplateView
 from django.http import JsonResponse
 from django.views import View
 from django.utils import timezone
-from appointments.models import Appointment
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import etag
+from django.template.loader import get_template
+from django.db.models import Count, F, Q
 from .models import PatientQueue
 from .services import CheckInService
+import hashlib
 import json
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Templates the scanner page is rendered from; a deploy that changes either one must change the ETag
+SCANNER_TEMPLATES = ('queues/qr_scanner.html', 'accounts/base.html')
+
+
+def _scanner_templates_version():
+    """Latest modification time of the scanner page templates."""
+    return max(os.path.getmtime(get_template(name).origin.name) for name in SCANNER_TEMPLATES)
+
+
+def _scanner_etag(request):
+    """
+    ETag for the QR scanner page, which varies by the templates it is built from
+    and by the user's identity, name, role and session.
+    Returns None (no conditional GET) for anonymous users and while flash
+    messages are pending, since the base template renders those.
+    """
+    user = request.user
+    if not user.is_authenticated or len(messages.get_messages(request)):
+        return None
+    raw = (
+        f"{_scanner_templates_version()}:{user.pk}:{user.role}:"
+        f"{user.get_full_name()}:{request.session.session_key}"
+    )
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+@method_decorator(etag(_scanner_etag), name='dispatch')
 class QRScannerView(LoginRequiredMixin, TemplateView):
     """
     Display QR scanner interface for check-in.
@@ -37,22 +70,26 @@ class ProcessCheckInView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         """Handle check-in request"""
         try:
-            logger.info(f"Check-in request received from user: {request.user.email}")
-            logger.info(f"Request body: {request.body}")
+            logger.debug("Check-in request received from user %s", request.user.pk)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Request body: %s", request.body)
             
             # Parse JSON body
             try:
                 data = json.loads(request.body)
-                logger.info(f"Parsed JSON data: {data}")
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {e}")
+                logger.debug("Parsed JSON data: %s", data)
+            except ValueError as e:
+                # JSONDecodeError, or UnicodeDecodeError for a body that is not UTF-8
+                logger.error("JSON decode error: %s", e)
                 return JsonResponse({
                     'success': False,
                     'message': 'Invalid request format.'
                 }, status=400)
             
-            qr_data = data.get('qr_data', '').strip()
-            logger.info(f"QR data extracted: '{qr_data}'")
+            # Anything but {"qr_data": "<string>"} is treated as a missing code
+            qr_data = data.get('qr_data') if isinstance(data, dict) else None
+            qr_data = qr_data.strip() if isinstance(qr_data, str) else ''
+            logger.debug("QR data extracted: '%s'", qr_data)
             
             if not qr_data:
                 logger.warning("No QR code data provided")
@@ -62,22 +99,72 @@ class ProcessCheckInView(LoginRequiredMixin, View):
                 }, status=400)
             
             # Process check-in through service layer
-            logger.info(f"Processing check-in for user {request.user.email} with QR: {qr_data}")
+            logger.debug("Processing check-in for user %s with QR: %s", request.user.pk, qr_data)
             result = CheckInService.process_check_in(request.user, qr_data)
-            logger.info(f"Check-in result: {result}")
+            logger.debug("Check-in result: %s", result)
             
             # Return JSON response
             status_code = 200 if result['success'] else 400
             return JsonResponse(result, status=status_code)
             
         except Exception as e:
-            logger.error(f"Unexpected error in check-in: {str(e)}", exc_info=True)
+            logger.error("Unexpected error in check-in: %s", e, exc_info=True)
             return JsonResponse({
                 'success': False,
                 'message': f'An unexpected error occurred: {str(e)}'
             }, status=500)
 
 
+class BatchCheckInView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Check in a group of patients in one request.
+    Reception staff post {"items": [{"qr_data": ..., "patient_id": ...}, ...]}
+    and get one result per item back, in the same order.
+    """
+    MAX_ITEMS = 100
+    
+    def test_func(self):
+        return self.request.user.is_nurse() or self.request.user.is_admin()
+    
+    def handle_no_permission(self):
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        return JsonResponse({
+            'success': False,
+            'message': 'Only reception staff can check in groups.'
+        }, status=403)
+    
+    def post(self, request, *args, **kwargs):
+        """Handle batch check-in request"""
+        try:
+            data = json.loads(request.body)
+        except ValueError as e:
+            logger.error("JSON decode error: %s", e)
+            data = None
+        
+        items = data.get('items') if isinstance(data, dict) else None
+        if (not isinstance(items, list) or not items or len(items) > self.MAX_ITEMS
+                or not all(isinstance(item, dict) for item in items)):
+            return JsonResponse({
+                'success': False,
+                'message': f'Provide between 1 and {self.MAX_ITEMS} check-in items.'
+            }, status=400)
+        
+        try:
+            results = CheckInService.process_batch_check_in(items)
+        except Exception as e:
+            logger.error("Unexpected error in batch check-in: %s", e, exc_info=True)
+            return JsonResponse({
+                'success': False,
+                'message': 'An unexpected error occurred during check-in.'
+            }, status=500)
+        
+        return JsonResponse({
+            'success': any(result['success'] for result in results),
+            'results': results
+        })
+
+
 class PatientQueueStatusView(LoginRequiredMixin, TemplateView):
     """
     Display real-time queue status for a patient.
@@ -92,10 +179,19 @@ class PatientQueueStatusView(LoginRequiredMixin, TemplateView):
         # Get the patient's active queue entry (WAITING or IN_PROGRESS)
         today = timezone.now().date()
         
-        queue_entry = PatientQueue.objects.filter(
+        # Count the people waiting ahead (WAITING with a lower position) in the same query
+        queue_entry = PatientQueue.objects.select_related('queue__doctor__user').filter(
             patient=patient,
             queue__date=today,
             status__in=['WAITING', 'IN_PROGRESS']
+        ).annotate(
+            people_ahead=Count(
+                'queue__patient_queues',
+                filter=Q(
+                    queue__patient_queues__status='WAITING',
+                    queue__patient_queues__position__lt=F('position')
+                )
+            )
         ).first()
         
         if not queue_entry:
@@ -108,23 +204,7 @@ class PatientQueueStatusView(LoginRequiredMixin, TemplateView):
         context['doctor'] = queue_entry.queue.doctor
         
         # Check if doctor has checked in (has any appointments checked in today)
-        doctor_checked_in = Appointment.objects.filter(
-            doctor=queue_entry.queue.doctor,
-            appointment_date=today,
-            status__in=['CHECKED_IN', 'IN_PROGRESS', 'COMPLETED']
-        ).exists()
-        
-        context['doctor_checked_in'] = doctor_checked_in
-        
-        # Calculate dynamic estimated time based on current position
-        current_position = queue_entry.position
-        # Find how many people are ahead (WAITING with lower position)
-        people_ahead = PatientQueue.objects.filter(
-            queue=queue_entry.queue,
-            status='WAITING',
-            position__lt=current_position
-        ).count()
-        
-        context['people_ahead'] = people_ahead
+        context['doctor_checked_in'] = CheckInService.is_doctor_checked_in(queue_entry.queue.doctor_id, today)
+        context['people_ahead'] = queue_entry.people_ahead
         
         return context
\ No newline at end of file